@@ -7,9 +7,25 @@ conversation history using the input() function for user interaction.
 
 import sys
 import os
+import textwrap
+import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.claude_helpers import add_user_message, add_assistant_message, chat, get_claude_client
+from utils.claude_helpers import chat, chat_stream, get_claude_client
+
+# Special chat commands, mapped to the action they trigger
+_COMMANDS = {
+    'quit': 'exit',
+    'exit': 'exit',
+    'bye': 'exit',
+    'history': 'history',
+    'clear': 'clear',
+}
+
+# Flush streamed text at most this often (seconds) to limit terminal writes
+_FLUSH_INTERVAL = 0.05
+
+_CLEARED_BANNER = "\n🔄 Conversation cleared. Starting fresh!\nClaude: Hello again! How can I help you?"
 
 def interactive_chatbot():
     """
@@ -22,8 +38,15 @@ def interactive_chatbot():
     print("Type 'clear' to start a new conversation")
     print("=" * 40)
     
-    # Initialize conversation
+    # Initialize conversation, keeping at most CLAUDE_MAX_TURNS exchanges so the
+    # payload sent each turn stays bounded. When the window fills, the oldest
+    # half is dropped at once rather than one message per turn, so the history
+    # prefix stays identical between evictions and keeps hitting the prompt cache
+    max_turns = int(os.getenv("CLAUDE_MAX_TURNS", "20"))
+    evict_count = 2 * max(1, max_turns // 2)
     messages = []
+    # Bound once; 'clear' and eviction edit the list in place so this stays valid
+    append = messages.append
     
     # Test connection first
     try:
@@ -41,39 +64,57 @@ def interactive_chatbot():
             user_input = input("\nYou: ").strip()
             
             # Check for special commands
-            if user_input.lower() in ['quit', 'exit', 'bye']:
+            cmd = _COMMANDS.get(user_input.lower())
+            if cmd == 'exit':
                 print("\nClaude: Goodbye! It was nice chatting with you.")
                 break
             
-            elif user_input.lower() == 'history':
-                print(f"\n📊 Conversation History ({len(messages)} messages):")
-                for i, msg in enumerate(messages, 1):
-                    role = "You" if msg['role'] == 'user' else "Claude"
-                    content = msg['content'][:100] + "..." if len(msg['content']) > 100 else msg['content']
-                    print(f"{i}. {role}: {content}")
+            elif cmd == 'history':
+                # Build the whole listing and write it in one go
+                lines = [f"\n📊 Conversation History ({len(messages)} messages):"]
+                lines += [
+                    f"{i}. {'You' if msg['role'] == 'user' else 'Claude'}: "
+                    f"{textwrap.shorten(msg['content'], 100, placeholder='...')}"
+                    for i, msg in enumerate(messages, 1)
+                ]
+                sys.stdout.write("\n".join(lines) + "\n")
                 continue
             
-            elif user_input.lower() == 'clear':
-                messages = []
-                print("\n🔄 Conversation cleared. Starting fresh!")
-                print("Claude: Hello again! How can I help you?")
+            elif cmd == 'clear':
+                messages.clear()
+                print(_CLEARED_BANNER)
                 continue
             
             elif not user_input:
                 print("Please enter a message or type 'quit' to exit.")
                 continue
             
-            # Add user message to conversation
-            add_user_message(messages, user_input)
+            # Add user message to conversation, evicting whole exchanges so the
+            # history still starts with a user turn
+            if len(messages) >= 2 * max_turns:
+                del messages[:evict_count]
+            append({"role": "user", "content": user_input})
             
             # Get Claude's response
             print("\nClaude: ", end="", flush=True)
             try:
-                response = chat(messages, max_tokens=500)
-                print(response)
+                # Print the response as it streams in, flushing on newlines
+                # or every _FLUSH_INTERVAL rather than once per chunk
+                chunks = []
+                write = sys.stdout.write
+                last_flush = time.monotonic()
+                for text in chat_stream(messages, max_tokens=500, cache_prefix=True):
+                    write(text)
+                    chunks.append(text)
+                    now = time.monotonic()
+                    if "\n" in text or now - last_flush > _FLUSH_INTERVAL:
+                        sys.stdout.flush()
+                        last_flush = now
+                print(flush=True)
+                response = "".join(chunks)
                 
                 # Add Claude's response to conversation history
-                add_assistant_message(messages, response)
+                append({"role": "assistant", "content": response})
                 
             except Exception as e:
                 print(f"Sorry, I encountered an error: {e}")
@@ -105,11 +146,11 @@ def demo_conversation():
     try:
         for user_msg in demo_inputs:
             print(f"\nUser: {user_msg}")
-            add_user_message(messages, user_msg)
+            messages.append({"role": "user", "content": user_msg})
             
             response = chat(messages, max_tokens=300)
             print(f"Claude: {response}")
-            add_assistant_message(messages, response)
+            messages.append({"role": "assistant", "content": response})
             
             # Small pause for readability
             input("\nPress Enter to continue...")
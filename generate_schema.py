@@ -4,25 +4,147 @@ CLI script for generating Claude tool schemas from Python functions
 
 Usage:
     python generate_schema.py <python_file> <function_name>
+    python generate_schema.py <python_file> --batch <function_name> [<function_name> ...]
+    python generate_schema.py <python_file> --all
     python generate_schema.py --help
     
 Examples:
     python generate_schema.py utils/claude_helpers.py simple_chat
     python generate_schema.py my_functions.py calculate_area
+    python generate_schema.py examples/sample_tools.py --batch get_weather calculate_distance
+    python generate_schema.py examples/sample_tools.py --all
 """
 
 import argparse
+import ast
 import importlib.util
 import inspect
 import json
 import sys
 from pathlib import Path
+from types import ModuleType
 
 # Add utils to path so we can import our schema generator
-sys.path.insert(0, str(Path(__file__).parent / "utils"))
+_UTILS_DIR = Path(__file__).parent / "utils"
+sys.path.insert(0, str(_UTILS_DIR))
 
 from claude_schema_generator import generate_schema_from_function, validate_schema
 
+try:
+    import orjson
+except ImportError:  # optional speedup, fall back to the standard library
+    orjson = None
+
+# Loaded modules keyed by (absolute path, mtime) so each file is executed once
+_MODULE_CACHE: dict[tuple[str, float], ModuleType] = {}
+
+# Generated schemas persisted across runs, invalidated when the loaded file, the
+# file that defines the function, or the schema generator itself changes
+_SCHEMA_CACHE_PATH = Path.home() / ".cache" / "claude_helpers" / "schemas.json"
+_GENERATOR_PATH = _UTILS_DIR / "claude_schema_generator.py"
+
+
+def _load_module(file_path: Path) -> ModuleType:
+    """
+    Import a Python file as a module, reusing it if the file is unchanged
+    
+    Args:
+        file_path (Path): Path to the Python file
+        
+    Returns:
+        module: The executed module
+    """
+    key = (str(file_path.resolve()), file_path.stat().st_mtime)
+    module = _MODULE_CACHE.get(key)
+    if module is not None:
+        return module
+    
+    spec = importlib.util.spec_from_file_location("temp_module", file_path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Could not load module from {file_path}")
+    
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _MODULE_CACHE[key] = module
+    return module
+
+
+def _load_schema_cache() -> dict:
+    """Read the persisted schema cache, treating a missing or corrupt file as empty"""
+    try:
+        return json.loads(_SCHEMA_CACHE_PATH.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_schema_cache(cache: dict) -> None:
+    """Write the schema cache back to disk, skipping it if the cache is not writable"""
+    try:
+        _SCHEMA_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _SCHEMA_CACHE_PATH.write_text(json.dumps(cache), encoding='utf-8')
+    except OSError:
+        # The cache is best-effort and must never fail the command
+        pass
+
+
+def _schema_cache_key(file_path: str, function_name: str) -> str:
+    """Build the cache key for a function's schema from its file and name"""
+    return f"{Path(file_path).resolve()}::{function_name}"
+
+
+def _function_source_file(func):
+    """
+    Find the file a function is actually defined in
+    
+    This differs from the file it was loaded from when the function is
+    imported there from another module.
+    
+    Args:
+        func: Python function object
+        
+    Returns:
+        str: Path to the defining file, or None if it cannot be determined
+    """
+    func = inspect.unwrap(func)
+    try:
+        source_file = inspect.getsourcefile(func)
+    except TypeError:
+        source_file = None
+    if source_file is None:
+        code = getattr(func, "__code__", None)
+        source_file = code.co_filename if code is not None else None
+    if source_file is None or not Path(source_file).exists():
+        return None
+    return str(Path(source_file).resolve())
+
+
+def _schema_stamp(file_path: str, source_file: str):
+    """
+    Build the freshness stamp for a cached schema
+    
+    Args:
+        file_path (str): Path to the Python file the function is loaded from
+        source_file (str): Path to the file that defines the function
+        
+    Returns:
+        list: The file, defining file and generator mtimes, or None if the
+            defining file no longer exists
+    """
+    try:
+        source_mtime = Path(source_file).stat().st_mtime
+    except (OSError, TypeError):
+        return None
+    return [Path(file_path).stat().st_mtime, source_mtime, _GENERATOR_PATH.stat().st_mtime]
+
+
+def _check_python_file(file_path: Path) -> None:
+    """Raise if file_path does not exist or is not a .py file"""
+    if not file_path.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+    
+    if not file_path.suffix == '.py':
+        raise ValueError(f"File must be a Python file (.py): {file_path}")
+
 
 def load_function_from_file(file_path: str, function_name: str):
     """
@@ -37,20 +159,10 @@ def load_function_from_file(file_path: str, function_name: str):
     """
     # Convert to Path object for easier handling
     file_path = Path(file_path)
-    
-    if not file_path.exists():
-        raise FileNotFoundError(f"File not found: {file_path}")
-    
-    if not file_path.suffix == '.py':
-        raise ValueError(f"File must be a Python file (.py): {file_path}")
+    _check_python_file(file_path)
     
     # Load the module
-    spec = importlib.util.spec_from_file_location("temp_module", file_path)
-    if spec is None or spec.loader is None:
-        raise ImportError(f"Could not load module from {file_path}")
-    
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
+    module = _load_module(file_path)
     
     # Get the function
     if not hasattr(module, function_name):
@@ -64,37 +176,46 @@ def load_function_from_file(file_path: str, function_name: str):
     return getattr(module, function_name)
 
 
+def _dumps(obj, pretty: bool) -> bytes:
+    """
+    Serialize obj to UTF-8 JSON bytes, using orjson when it is installed
+    
+    Args:
+        obj: JSON-serializable object
+        pretty (bool): Indent the output by two spaces
+        
+    Returns:
+        bytes: Encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    return json.dumps(obj, indent=2 if pretty else None, ensure_ascii=False).encode('utf-8')
+
+
 def list_functions_in_file(file_path: str) -> list:
     """
     List all functions in a Python file
     
+    The file is parsed, not executed, so listing has no import side effects.
+    
     Args:
         file_path (str): Path to the Python file
         
     Returns:
-        list: List of function names
+        list: List of function names, in definition order
     """
     file_path = Path(file_path)
     
     if not file_path.exists():
         raise FileNotFoundError(f"File not found: {file_path}")
     
-    # Load the module
-    spec = importlib.util.spec_from_file_location("temp_module", file_path)
-    if spec is None or spec.loader is None:
-        raise ImportError(f"Could not load module from {file_path}")
-    
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    
-    # Get all functions
-    functions = []
-    for name in dir(module):
-        obj = getattr(module, name)
-        if callable(obj) and not name.startswith('_') and inspect.isfunction(obj):
-            functions.append(name)
+    tree = ast.parse(file_path.read_text(encoding='utf-8'), filename=str(file_path))
     
-    return functions
+    # Only public top-level functions
+    return [
+        node.name for node in tree.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and not node.name.startswith('_')
+    ]
 
 
 def main():
@@ -106,6 +227,8 @@ Examples:
   %(prog)s utils/claude_helpers.py simple_chat
   %(prog)s my_functions.py calculate_area --output schema.json
   %(prog)s utils/claude_helpers.py --list
+  %(prog)s examples/sample_tools.py --batch get_weather calculate_distance
+  %(prog)s examples/sample_tools.py --all
         """
     )
     
@@ -116,8 +239,20 @@ Examples:
     
     parser.add_argument(
         "function_name",
-        nargs="?",
-        help="Name of the function to generate schema for"
+        nargs="*",
+        help="Name of the function to generate schema for (several with --batch)"
+    )
+    
+    parser.add_argument(
+        "--batch", "-b",
+        action="store_true",
+        help="Generate schemas for several functions and output a JSON array"
+    )
+    
+    parser.add_argument(
+        "--all", "-a",
+        action="store_true",
+        help="Generate schemas for every function in the file as a JSON array"
     )
     
     parser.add_argument(
@@ -137,6 +272,12 @@ Examples:
         help="Validate the generated schema"
     )
     
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Regenerate schemas instead of reusing ones cached from earlier runs"
+    )
+    
     parser.add_argument(
         "--pretty", "-p",
         action="store_true",
@@ -144,7 +285,7 @@ Examples:
         help="Pretty print JSON output (default: True)"
     )
     
-    args = parser.parse_args()
+    args = parser.parse_intermixed_args()
     
     try:
         # List functions mode
@@ -156,36 +297,71 @@ Examples:
             return
         
         # Generate schema mode
-        if not args.function_name:
-            parser.error("function_name is required unless using --list")
+        if args.all:
+            if args.function_name:
+                parser.error("function_name cannot be combined with --all")
+            args.function_name = list_functions_in_file(args.file_path)
+            args.batch = True
+        elif not args.function_name:
+            parser.error("function_name is required unless using --list or --all")
+        if len(args.function_name) > 1 and not args.batch:
+            parser.error("use --batch to generate schemas for several functions")
         
-        # Load the function
-        func = load_function_from_file(args.file_path, args.function_name)
+        # Report a missing or non-Python file before touching the cache
+        _check_python_file(Path(args.file_path))
         
-        # Generate schema
-        print(f"Generating schema for {args.function_name}...", file=sys.stderr)
-        schema = generate_schema_from_function(func)
+        schema_cache = {} if args.no_cache else _load_schema_cache()
+        cache_dirty = False
         
-        # Validate if requested
-        if args.validate:
-            is_valid = validate_schema(schema)
-            print(f"Schema validation: {'PASSED' if is_valid else 'FAILED'}", file=sys.stderr)
-            if not is_valid:
-                sys.exit(1)
+        schemas = []
+        for function_name in args.function_name:
+            key = _schema_cache_key(args.file_path, function_name)
+            entry = schema_cache.get(key)
+            
+            if entry is not None and entry["stamp"] == _schema_stamp(args.file_path, entry.get("source_file")):
+                # Unchanged since the last run: no need to load the module at all
+                print(f"Using cached schema for {function_name}", file=sys.stderr)
+                schema = entry["schema"]
+            else:
+                # Load the function (the module is only executed once)
+                func = load_function_from_file(args.file_path, function_name)
+                
+                # Generate schema
+                print(f"Generating schema for {function_name}...", file=sys.stderr)
+                schema = generate_schema_from_function(func)
+                
+                # Stamp with the defining file, which may be a module the
+                # function was imported from, so edits there invalidate it
+                source_file = _function_source_file(func)
+                stamp = _schema_stamp(args.file_path, source_file)
+                if stamp is not None:
+                    schema_cache[key] = {"source_file": source_file, "stamp": stamp, "schema": schema}
+                    cache_dirty = True
+            
+            # Validate if requested
+            if args.validate:
+                is_valid = validate_schema(schema)
+                print(f"Schema validation: {'PASSED' if is_valid else 'FAILED'}", file=sys.stderr)
+                if not is_valid:
+                    sys.exit(1)
+            
+            schemas.append(schema)
+        
+        if cache_dirty and not args.no_cache:
+            _save_schema_cache(schema_cache)
+        
+        schema = schemas if args.batch else schemas[0]
         
         # Format output
-        if args.pretty:
-            output = json.dumps(schema, indent=2, ensure_ascii=False)
-        else:
-            output = json.dumps(schema, ensure_ascii=False)
+        output = _dumps(schema, args.pretty)
         
         # Write output
         if args.output:
-            with open(args.output, 'w', encoding='utf-8') as f:
+            with open(args.output, 'wb') as f:
                 f.write(output)
             print(f"Schema written to {args.output}", file=sys.stderr)
         else:
-            print(output)
+            sys.stdout.buffer.write(output + b"\n")
             
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
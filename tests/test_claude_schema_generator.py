@@ -0,0 +1,129 @@
+"""
+Tests for the Claude tool schema generator
+"""
+import functools
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "utils"))
+
+from claude_schema_generator import SchemaGenerator, generate_schema_from_function, generate_tool_schemas
+
+
+def tool(func):
+    """Decorator that wraps a tool function, as agent frameworks commonly do"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return func(*args, **kwargs)
+    return wrapper
+
+
+@tool
+def get_weather(location: str, units: str = "celsius") -> dict:
+    """
+    Get weather information for a location
+
+    Args:
+        location (str): The city name
+        units (str): Temperature units
+    """
+    return {"location": location, "units": units}
+
+
+@tool
+def add(a: int, b: int) -> int:
+    """
+    Add two numbers
+
+    Args:
+        a (int): First number
+        b (int): Second number
+    """
+    return a + b
+
+
+class GenerateFromFunctionCacheTest(unittest.TestCase):
+    def test_decorated_tools_sharing_code_get_their_own_schema(self):
+        self.assertIs(get_weather.__code__, add.__code__)
+
+        weather, adder = generate_tool_schemas([get_weather, add])
+
+        self.assertEqual(weather["name"], "get_weather")
+        self.assertEqual(list(weather["input_schema"]["properties"]), ["location", "units"])
+        self.assertEqual(weather["input_schema"]["required"], ["location"])
+        self.assertEqual(adder["name"], "add")
+        self.assertEqual(adder["description"], "Add two numbers")
+        self.assertEqual(adder["input_schema"]["properties"]["a"]["type"], "number")
+        self.assertEqual(adder["input_schema"]["required"], ["a", "b"])
+
+    def test_cached_schema_refreshes_after_docstring_change(self):
+        def make():
+            def greet(name: str):
+                """Say hello"""
+            return greet
+
+        greet = make()
+        self.assertEqual(generate_schema_from_function(greet)["description"], "Say hello")
+        greet.__doc__ = "Say goodbye"
+        self.assertEqual(generate_schema_from_function(greet)["description"], "Say goodbye")
+
+    def test_generators_with_instance_state_are_not_shared(self):
+        class PrefixedGenerator(SchemaGenerator):
+            def __init__(self, prefix):
+                super().__init__()
+                self.prefix = prefix
+
+            def _generate_uncached(self, func):
+                schema = super()._generate_uncached(func)
+                schema["name"] = self.prefix + schema["name"]
+                return schema
+
+        self.assertEqual(PrefixedGenerator("a_").generate_from_function(add)["name"], "a_add")
+        self.assertEqual(PrefixedGenerator("b_").generate_from_function(add)["name"], "b_add")
+        self.assertEqual(generate_schema_from_function(add)["name"], "add")
+
+
+class GenerateToolSchemaCacheTest(unittest.TestCase):
+    SOURCE = '''
+def lookup(key: str) -> str:
+    """Look up a key"""
+'''
+
+    def test_cache_hit_sets_current_function(self):
+        SchemaGenerator().generate_tool_schema(self.SOURCE)
+
+        generator = SchemaGenerator()
+        schema = generator.generate_tool_schema(self.SOURCE)
+
+        self.assertEqual(schema["name"], "lookup")
+        self.assertEqual(generator.current_function.name, "lookup")
+
+    def test_subclass_with_init_arguments(self):
+        class PrefixedGenerator(SchemaGenerator):
+            def __init__(self, prefix):
+                super().__init__()
+                self.prefix = prefix
+
+            def _build_tool_schema(self, function_def):
+                schema = super()._build_tool_schema(function_def)
+                schema["name"] = self.prefix + schema["name"]
+                return schema
+
+        self.assertEqual(PrefixedGenerator("kv_").generate_tool_schema(self.SOURCE)["name"], "kv_lookup")
+        self.assertEqual(PrefixedGenerator("x_").generate_tool_schema(self.SOURCE)["name"], "x_lookup")
+        self.assertEqual(SchemaGenerator().generate_tool_schema(self.SOURCE)["name"], "lookup")
+
+    def test_instance_type_mapping_bypasses_cache(self):
+        SchemaGenerator().generate_tool_schema(self.SOURCE)
+
+        generator = SchemaGenerator()
+        generator.TYPE_MAPPING = {**SchemaGenerator.TYPE_MAPPING, "str": "integer"}
+        schema = generator.generate_tool_schema(self.SOURCE)
+
+        self.assertEqual(schema["input_schema"]["properties"]["key"]["type"], "integer")
+        self.assertEqual(SchemaGenerator().generate_tool_schema(self.SOURCE)["input_schema"]["properties"]["key"]["type"], "string")
+
+
+if __name__ == "__main__":
+    unittest.main()
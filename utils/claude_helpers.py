@@ -2,54 +2,204 @@
 Helper functions for working with Claude API
 Following the tutorial pattern for message management
 """
+import asyncio
+import collections
+import functools
+import hashlib
+import json
 import os
-from anthropic import Anthropic
+import sqlite3
+import threading
+import time
+import weakref
+from pathlib import Path
+import httpx
+from anthropic import Anthropic, AsyncAnthropic, DefaultAsyncHttpxClient, DefaultHttpxClient
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Global client instance
-client = None
+# Keep idle connections open for 5 minutes so sockets stay warm between the
+# slow, human-paced turns of an interactive chat. The SDK's Default*HttpxClient
+# keeps its own timeout (600s) and other defaults; only the pool is tuned here
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=4, keepalive_expiry=300.0)
 
+# Async clients, one per event loop (their connection pools are loop-bound)
+_async_clients = weakref.WeakKeyDictionary()
+
+# In-process LRU cache of chat() responses, enabled with CLAUDE_CACHE=1
+_RESPONSE_CACHE = collections.OrderedDict()
+_CACHE_MAX = 512
+
+# Persistent cache tier shared across runs (expires after CLAUDE_CACHE_TTL seconds)
+_DISK_CACHE_PATH = Path.home() / ".cache" / "claude_helpers" / "responses.sqlite"
+_disk_cache_conn = None
+_disk_cache_lock = threading.Lock()
+
+# Embedding-similarity cache for simple_chat(), enabled with CLAUDE_SEMANTIC_CACHE=1
+_semantic_cache = None
+
+@functools.lru_cache(maxsize=1)
 def get_claude_client():
-    """Initialize and return Claude client"""
-    global client
-    if client is None:
+    """Initialize (once) and return Claude client"""
+    api_key = os.getenv('ANTHROPIC_API_KEY')
+    if not api_key:
+        raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
+    http_client = DefaultHttpxClient(limits=_HTTP_LIMITS)
+    return Anthropic(api_key=api_key, http_client=http_client)
+
+def get_async_claude_client():
+    """Return the async Claude client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    async_client = _async_clients.get(loop)
+    if async_client is None:
         api_key = os.getenv('ANTHROPIC_API_KEY')
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
-        client = Anthropic(api_key=api_key)
-    return client
+        http_client = DefaultAsyncHttpxClient(limits=_HTTP_LIMITS)
+        async_client = AsyncAnthropic(api_key=api_key, http_client=http_client)
+        _async_clients[loop] = async_client
+    return async_client
 
 def add_user_message(messages, text):
-    """Add a user message to the messages list"""
-    user_message = {"role": "user", "content": text}
-    messages.append(user_message)
+    """Add a user message to the messages list (or any appendable, e.g. a deque)"""
+    messages.append({"role": "user", "content": text})
 
 def add_assistant_message(messages, text):
-    """Add an assistant message to the messages list"""
-    assistant_message = {"role": "assistant", "content": text}
-    messages.append(assistant_message)
+    """Add an assistant message to the messages list (or any appendable, e.g. a deque)"""
+    messages.append({"role": "assistant", "content": text})
+
+def _cache_enabled():
+    """Check whether response caching is turned on via CLAUDE_CACHE=1"""
+    return os.getenv('CLAUDE_CACHE') == '1'
+
+def _cache_key(request_params):
+    """Build a stable SHA-256 key for a set of request parameters"""
+    payload = json.dumps(request_params, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _remember(key, text):
+    """Insert a response into the in-memory LRU, evicting the oldest entry"""
+    _RESPONSE_CACHE[key] = text
+    if len(_RESPONSE_CACHE) > _CACHE_MAX:
+        _RESPONSE_CACHE.popitem(last=False)
+
+def _get_disk_cache():
+    """Open (once) and return the SQLite connection backing the disk cache"""
+    global _disk_cache_conn
+    if _disk_cache_conn is None:
+        _DISK_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(_DISK_CACHE_PATH), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, value TEXT, expires_at REAL)"
+        )
+        _disk_cache_conn = conn
+    return _disk_cache_conn
+
+def _disk_cache_get(key):
+    """Return the unexpired cached response for key, or None"""
+    with _disk_cache_lock:
+        row = _get_disk_cache().execute(
+            "SELECT value FROM cache WHERE key=? AND expires_at>?",
+            (key, time.time())
+        ).fetchone()
+    return row[0] if row else None
+
+def _disk_cache_set(key, value):
+    """Store a response on disk with an expiry of CLAUDE_CACHE_TTL seconds"""
+    expires_at = time.time() + int(os.getenv('CLAUDE_CACHE_TTL', '3600'))
+    with _disk_cache_lock:
+        conn = _get_disk_cache()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, expires_at)
+        )
+        conn.commit()
 
-def chat(messages, model="claude-3-haiku-20240307", max_tokens=1000, system=None, temperature=0.2, stop_sequences=None):
+def clear_response_cache():
+    """Drop all cached chat() responses, in memory and on disk"""
+    _RESPONSE_CACHE.clear()
+    with _disk_cache_lock:
+        conn = _get_disk_cache()
+        conn.execute("DELETE FROM cache")
+        conn.commit()
+
+_EPHEMERAL = {"type": "ephemeral"}
+_PROMPT_CACHING_HEADERS = {"anthropic-beta": "prompt-caching-2024-07-31"}
+
+def _with_cache_breakpoint(message):
+    """Return a copy of message whose last content block is marked cacheable"""
+    content = message["content"]
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content, "cache_control": _EPHEMERAL}]
+    else:
+        blocks = list(content)
+        blocks[-1] = {**blocks[-1], "cache_control": _EPHEMERAL}
+    return {**message, "content": blocks}
+
+def _apply_prompt_caching(request_params):
     """
-    Send messages to Claude and return response text
+    Mark the stable prefix of a request for Anthropic prompt caching
     
-    Args:
-        messages (list): List of message dictionaries
-        model (str): Model to use
-        max_tokens (int): Maximum tokens in response
-        system (str): System prompt to set Claude's behavior
-        temperature (float): Response creativity (0.0-1.0)
-        stop_sequences (list): Sequences where Claude should stop generating
+    The system prompt and the newest message before the current user turn get
+    a cache breakpoint, so every earlier turn is read from the prompt cache
+    instead of being prefilled again. The caller's messages are not modified.
+    """
+    messages = request_params["messages"]
+    if len(messages) > 1:
+        request_params["messages"] = messages[:-2] + [_with_cache_breakpoint(messages[-2]), messages[-1]]
+    if "system" in request_params:
+        request_params["system"] = [
+            {"type": "text", "text": request_params["system"], "cache_control": _EPHEMERAL}
+        ]
+    request_params["extra_headers"] = _PROMPT_CACHING_HEADERS
+
+def _has_user_content(messages):
+    """Check that at least one user message has non-blank content"""
+    for m in messages:
+        if m.get("role") != "user":
+            continue
+        content = m.get("content", "")
+        # Content-block lists (images, tool results) count as real input
+        if content.strip() if isinstance(content, str) else content:
+            return True
+    return False
+
+def _estimate_tokens(messages):
+    """Estimate a conversation's token count with the ~4 characters/token heuristic"""
+    total = 0
+    for m in messages:
+        content = m["content"]
+        if not isinstance(content, str):
+            content = json.dumps(content, default=str)
+        total += len(content) // 4
+    return total
+
+def _prune_to_budget(messages, max_tokens):
+    """
+    Drop the oldest exchanges until the conversation fits the token budget
     
-    Returns:
-        str: Claude's response text
+    Messages are removed in user/assistant pairs so roles keep alternating,
+    and the latest turn is always kept.
     """
-    client = get_claude_client()
+    start = 0
+    total = _estimate_tokens(messages)
+    while total > max_tokens and len(messages) - start > 2:
+        total -= _estimate_tokens(messages[start:start + 2])
+        start += 2
+    return messages[start:]
+
+def _build_request(messages, model, max_tokens, system, temperature, stop_sequences):
+    """Assemble the messages.create/stream parameters shared by chat() and chat_stream()"""
+    messages = list(messages)
+    # Rough context budget for outgoing requests; unset means never prune
+    max_context_tokens = os.getenv('CLAUDE_MAX_CONTEXT_TOKENS')
+    if max_context_tokens:
+        messages = _prune_to_budget(messages, int(max_context_tokens))
     
-    # Prepare the request parameters
     request_params = {
         "model": model,
         "max_tokens": max_tokens,
@@ -62,10 +212,164 @@ def chat(messages, model="claude-3-haiku-20240307", max_tokens=1000, system=None
         request_params["system"] = system
     if stop_sequences:
         request_params["stop_sequences"] = stop_sequences
+    return request_params
+
+def _cached_response(key):
+    """Look a response up in memory, then on disk; returns None on a miss"""
+    if key in _RESPONSE_CACHE:
+        _RESPONSE_CACHE.move_to_end(key)
+        return _RESPONSE_CACHE[key]
+    cached = _disk_cache_get(key)
+    if cached is not None:
+        _remember(key, cached)
+    return cached
+
+def _store_response(key, text):
+    """Save a response to both cache tiers"""
+    _remember(key, text)
+    _disk_cache_set(key, text)
+
+def _prepare(messages, model, max_tokens, system, temperature, stop_sequences, cache_prefix):
+    """
+    Run the request prologue shared by chat(), chat_stream() and achat()
     
+    Returns:
+        tuple: (request_params, key, cached). cached is the response to use
+            without calling the API ("" for a blank prompt), or None on a miss,
+            in which case request_params is ready to send and key (when caching
+            is enabled) is where to store the reply.
+    """
+    # Blank prompts would cost a full round trip for a useless reply
+    if not _has_user_content(messages):
+        return None, None, ""
+    
+    request_params = _build_request(messages, model, max_tokens, system, temperature, stop_sequences)
+    
+    # Serve identical repeat requests from the cache when enabled
+    key = _cache_key(request_params) if _cache_enabled() else None
+    if key:
+        cached = _cached_response(key)
+        if cached is not None:
+            return request_params, key, cached
+    
+    if cache_prefix:
+        _apply_prompt_caching(request_params)
+    return request_params, key, None
+
+def chat(messages, model="claude-3-haiku-20240307", max_tokens=1000, system=None, temperature=0.2, stop_sequences=None, cache_prefix=False):
+    """
+    Send messages to Claude and return response text
+    
+    Args:
+        messages (list): List (or other sequence) of message dictionaries
+        model (str): Model to use
+        max_tokens (int): Maximum tokens in response
+        system (str): System prompt to set Claude's behavior
+        temperature (float): Response creativity (0.0-1.0)
+        stop_sequences (list): Sequences where Claude should stop generating
+        cache_prefix (bool): Use prompt caching for the conversation so far
+    
+    Returns:
+        str: Claude's response text ("" for a blank prompt)
+    """
+    request_params, key, cached = _prepare(messages, model, max_tokens, system, temperature, stop_sequences, cache_prefix)
+    if cached is not None:
+        return cached
+    
+    client = get_claude_client()
     message = client.messages.create(**request_params)
+    text = message.content[0].text
+    
+    if key:
+        _store_response(key, text)
+    
+    return text
+
+def chat_stream(messages, model="claude-3-haiku-20240307", max_tokens=1000, system=None, temperature=0.2, stop_sequences=None, cache_prefix=False):
+    """
+    Stream Claude's response text as it is generated
+    
+    Takes the same arguments as chat(). A cached response is yielded as a
+    single chunk; nothing is yielded for a blank prompt.
     
-    return message.content[0].text
+    Yields:
+        str: Pieces of Claude's response text
+    """
+    request_params, key, cached = _prepare(messages, model, max_tokens, system, temperature, stop_sequences, cache_prefix)
+    if cached is not None:
+        if cached:
+            yield cached
+        return
+    
+    client = get_claude_client()
+    chunks = []
+    with client.messages.stream(**request_params) as stream:
+        for text in stream.text_stream:
+            chunks.append(text)
+            yield text
+    
+    # Only complete responses are cached
+    if key:
+        _store_response(key, "".join(chunks))
+
+async def achat(messages, model="claude-3-haiku-20240307", max_tokens=1000, system=None, temperature=0.2, stop_sequences=None, cache_prefix=False):
+    """
+    Async version of chat() for running several requests concurrently
+    
+    Takes the same arguments as chat().
+    
+    Returns:
+        str: Claude's response text ("" for a blank prompt)
+    """
+    request_params, key, cached = _prepare(messages, model, max_tokens, system, temperature, stop_sequences, cache_prefix)
+    if cached is not None:
+        return cached
+    
+    async_client = get_async_claude_client()
+    message = await async_client.messages.create(**request_params)
+    text = message.content[0].text
+    
+    if key:
+        _store_response(key, text)
+    
+    return text
+
+async def abatch_chat(message_lists, **kwargs):
+    """
+    Send several independent conversations to Claude concurrently
+    
+    Args:
+        message_lists (list): One list of message dictionaries per request
+        **kwargs: Extra arguments passed to achat() for every request
+    
+    Returns:
+        list: Claude's response texts, in the same order as message_lists
+    """
+    return await asyncio.gather(*[achat(messages, **kwargs) for messages in message_lists])
+
+def batch_chat(message_lists, **kwargs):
+    """
+    Blocking wrapper around abatch_chat() for scripts
+    
+    Inside Jupyter (where an event loop is already running) use
+    `await abatch_chat(...)` instead.
+    
+    Returns:
+        list: Claude's response texts, in the same order as message_lists
+    """
+    return asyncio.run(abatch_chat(message_lists, **kwargs))
+
+def _get_semantic_cache():
+    """Create (once) and return the semantic cache used by simple_chat()"""
+    global _semantic_cache
+    if _semantic_cache is None:
+        # Imported lazily so numpy/sentence-transformers are only needed when enabled
+        try:
+            from .semantic_cache import SemanticCache
+        except ImportError:
+            from semantic_cache import SemanticCache
+        _semantic_cache = SemanticCache()
+    return _semantic_cache
 
 def simple_chat(message, model="claude-3-haiku-20240307", max_tokens=1000, system=None, temperature=0.2):
     """
@@ -80,9 +384,25 @@ def simple_chat(message, model="claude-3-haiku-20240307", max_tokens=1000, syste
     Returns:
         str: Claude's response
     """
+    use_semantic_cache = os.getenv('CLAUDE_SEMANTIC_CACHE') == '1'
+    if use_semantic_cache:
+        cache = _get_semantic_cache()
+        # Only reuse answers produced under identical request settings
+        context = _cache_key({"model": model, "max_tokens": max_tokens,
+                              "system": system, "temperature": temperature})
+        # Embed once; a miss reuses the vector when storing the new answer
+        vector = cache.embed(message)
+        cached = cache.lookup(message, context, vector=vector)
+        if cached is not None:
+            return cached
+    
     messages = []
     add_user_message(messages, message)
-    return chat(messages, model, max_tokens, system, temperature)
+    response = chat(messages, model, max_tokens, system, temperature)
+    
+    if use_semantic_cache:
+        cache.store(message, response, context, vector=vector)
+    return response
 
 def print_response(response):
     """Pretty print Claude's response"""
@@ -7,50 +7,143 @@ Claude tool schemas.
 """
 
 import ast
+import copy
+import functools
 import inspect
 import re
-from typing import Any, Dict, List, Optional, Union, get_type_hints, get_origin, get_args
+import weakref
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union, get_type_hints, get_origin, get_args
 import json
 
 
+# Parameter lines in Google ("name (type): desc") and Sphinx (":param name: desc") docstrings
+_GOOGLE_PARAM_RE = re.compile(r'(\w+)\s*(?:\([^)]+\))?\s*:\s*(.+)')
+_SPHINX_PARAM_RE = re.compile(r':param\s+(\w+)\s*:\s*(.+)')
+
+# Shared read-only parameter descriptions for functions without a docstring
+_EMPTY_DESCRIPTIONS = MappingProxyType({})
+
+# JSON Schema types for the origins of generic aliases such as List[str]
+_ORIGIN_TYPES = {
+    list: "array",
+    List: "array",
+    dict: "object",
+    Dict: "object",
+}
+
+# AST node types that define a function
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+# Schemas from a plain SchemaGenerator's generate_from_function, keyed by the
+# function object; entries disappear when the function is collected
+_schema_by_func = weakref.WeakKeyDictionary()
+
+
+# Schemas from a plain SchemaGenerator's generate_tool_schema, keyed by source
+# string and stored with their function node; the oldest entry is evicted past
+# the limit
+_tool_schema_cache: Dict[str, tuple] = {}
+_TOOL_SCHEMA_CACHE_SIZE = 256
+
+
+def _function_stamp(func) -> tuple:
+    """Capture the attributes a function's schema depends on, to detect later edits"""
+    # inspect.signature follows __wrapped__, so the signature parts come from
+    # the innermost function while name and docstring come from func itself
+    inner = inspect.unwrap(func)
+    return (
+        getattr(inner, "__code__", None),
+        getattr(inner, "__defaults__", None),
+        getattr(inner, "__kwdefaults__", None),
+        dict(getattr(inner, "__annotations__", None) or {}),
+        getattr(func, "__name__", None),
+        getattr(func, "__doc__", None),
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_cached(src: str) -> ast.Module:
+    """Parse source into an AST, memoized since tools are re-registered often"""
+    return ast.parse(src)
+
+
 class SchemaGenerator:
     """Generates Claude tool schemas from Python functions"""
     
-    # Type mapping from Python types to JSON Schema types
+    # Type mapping from Python types to JSON Schema types, keyed by both the
+    # type objects (introspection) and their names (AST annotations)
     TYPE_MAPPING = {
         str: "string",
-        int: "number", 
+        int: "number",
         float: "number",
         bool: "boolean",
         list: "array",
         dict: "object",
         List: "array",
         Dict: "object",
-        Any: "string"  # Default fallback
+        Any: "string",  # Default fallback
+        "str": "string",
+        "int": "number",
+        "float": "number",
+        "bool": "boolean",
+        "list": "array",
+        "dict": "object",
+        "List": "array",
+        "Dict": "object",
+        "Any": "string",
     }
     
     def __init__(self):
         self.current_function = None
     
+    def _uses_shared_cache(self) -> bool:
+        """
+        Check whether this generator's schemas can come from the module caches
+        
+        Subclasses and instances with their own TYPE_MAPPING may produce
+        different schemas for the same function, so they always build fresh.
+        """
+        return type(self) is SchemaGenerator and "TYPE_MAPPING" not in vars(self)
+    
     def generate_tool_schema(self, function_def: str) -> Dict[str, Any]:
         """
         Generate Claude tool schema from Python function definition string
         
+        Results are cached per source string for plain SchemaGenerator
+        instances; each call returns a fresh copy that is safe to mutate.
+        
         Args:
             function_def (str): Python function definition as string
             
         Returns:
             dict: Claude tool schema in proper format
         """
+        if not self._uses_shared_cache():
+            return self._build_tool_schema(function_def)
+        
+        entry = _tool_schema_cache.get(function_def)
+        if entry is None:
+            schema = self._build_tool_schema(function_def)
+            if len(_tool_schema_cache) >= _TOOL_SCHEMA_CACHE_SIZE:
+                del _tool_schema_cache[next(iter(_tool_schema_cache))]
+            _tool_schema_cache[function_def] = (self.current_function, copy.deepcopy(schema))
+            return schema
+        
+        self.current_function = entry[0]
+        return copy.deepcopy(entry[1])
+    
+    def _build_tool_schema(self, function_def: str) -> Dict[str, Any]:
+        """Generate the tool schema for a function definition string (uncached)"""
         # Parse the function definition
-        tree = ast.parse(function_def)
-        func_node = None
+        tree = _parse_cached(function_def)
         
-        # Find the function definition node
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                func_node = node
-                break
+        # Find the function definition node; it is normally top-level, so only
+        # walk the whole tree (e.g. for a class body) when it is not
+        func_node = next((node for node in tree.body if isinstance(node, _FUNCTION_NODES)), None)
+        if func_node is None:
+            func_node = next((node for node in ast.walk(tree) if isinstance(node, _FUNCTION_NODES)), None)
                 
         if not func_node:
             raise ValueError("No function definition found in provided string")
@@ -62,7 +155,10 @@ class SchemaGenerator:
         docstring = ast.get_docstring(func_node)
         
         # Parse docstring for description and parameter info
-        description, param_descriptions = self._parse_docstring(docstring)
+        if docstring:
+            description, param_descriptions = self._parse_docstring(docstring)
+        else:
+            description, param_descriptions = "", _EMPTY_DESCRIPTIONS
         
         # Generate input schema
         input_schema = self._generate_input_schema(func_node, param_descriptions)
@@ -86,21 +182,49 @@ class SchemaGenerator:
         Returns:
             dict: Claude tool schema
         """
-        # Get function source and parse it
+        # Reuse the schema built for this exact function object, unless its
+        # name, docstring, defaults or annotations have changed since
+        if not self._uses_shared_cache():
+            return self._generate_uncached(func)
+        
+        stamp = _function_stamp(func)
+        try:
+            entry = _schema_by_func.get(func)
+        except TypeError:  # not weak-referenceable, skip the cache
+            return self._generate_uncached(func)
+        if entry is not None and entry[0] == stamp:
+            return copy.deepcopy(entry[1])
+        
+        schema = self._generate_uncached(func)
+        _schema_by_func[func] = (stamp, copy.deepcopy(schema))
+        return schema
+    
+    def _generate_uncached(self, func) -> Dict[str, Any]:
+        """Generate the schema for a function object without consulting the cache"""
+        # Introspection needs no file I/O or parsing, so try it first
         try:
+            return self._generate_from_introspection(func)
+        except (ValueError, TypeError):
+            # Fall back to parsing the source if the signature is unavailable
             source = inspect.getsource(func)
             return self.generate_tool_schema(source)
-        except Exception as e:
-            # Fallback to introspection if source unavailable
-            return self._generate_from_introspection(func)
     
     def _generate_from_introspection(self, func) -> Dict[str, Any]:
-        """Generate schema using function introspection when source is unavailable"""
+        """Generate schema using function introspection (signature, type hints, docstring)"""
         sig = inspect.signature(func)
         func_name = func.__name__
         docstring = func.__doc__
         
-        description, param_descriptions = self._parse_docstring(docstring)
+        # Resolve string annotations (e.g. from __future__ import annotations)
+        try:
+            type_hints = get_type_hints(func)
+        except Exception:
+            type_hints = {}
+        
+        if docstring:
+            description, param_descriptions = self._parse_docstring(docstring)
+        else:
+            description, param_descriptions = "", _EMPTY_DESCRIPTIONS
         
         # Build properties and required lists
         properties = {}
@@ -109,6 +233,10 @@ class SchemaGenerator:
         for param_name, param in sig.parameters.items():
             if param_name == 'self':  # Skip self parameter
                 continue
+            if param.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+                continue  # *args/**kwargs are not named tool inputs
+            if param_name in type_hints:
+                param = param.replace(annotation=type_hints[param_name])
                 
             param_schema = self._get_param_schema_from_signature(param, param_descriptions)
             properties[param_name] = param_schema
@@ -139,20 +267,21 @@ class SchemaGenerator:
         if not docstring:
             return "", {}
             
-        lines = docstring.strip().split('\n')
-        description_lines = []
-        param_descriptions = {}
+        # Strip every line once here; the style parsers expect stripped lines
+        lines = [line.strip() for line in docstring.splitlines()]
         
-        # Parse different docstring styles
-        if self._is_google_style(docstring):
+        # Parse different docstring styles; the marker checks are inlined and
+        # short-circuit, which beats a regex scan on docstrings this short
+        if "Args:" in docstring or "Arguments:" in docstring:
             description, param_descriptions = self._parse_google_docstring(lines)
-        elif self._is_numpy_style(docstring):
+        elif "Parameters\n" in docstring or "Parameters:" in docstring:
             description, param_descriptions = self._parse_numpy_docstring(lines)
-        elif self._is_sphinx_style(docstring):
+        elif ":param" in docstring or ":type" in docstring:
             description, param_descriptions = self._parse_sphinx_docstring(lines)
         else:
             # Default: treat first paragraph as description
             description = self._extract_first_paragraph(lines)
+            param_descriptions = {}
             
         return description, param_descriptions
     
@@ -169,14 +298,12 @@ class SchemaGenerator:
         return ":param" in docstring or ":type" in docstring
     
     def _parse_google_docstring(self, lines: List[str]) -> tuple[str, Dict[str, str]]:
-        """Parse Google-style docstring"""
+        """Parse Google-style docstring from pre-stripped lines"""
         description_lines = []
         param_descriptions = {}
         in_args_section = False
         
         for line in lines:
-            line = line.strip()
-            
             if line in ["Args:", "Arguments:"]:
                 in_args_section = True
                 continue
@@ -185,26 +312,24 @@ class SchemaGenerator:
                 break
             elif in_args_section and line:
                 # Parse parameter line: "param_name (type): description"
-                match = re.match(r'(\w+)\s*(?:\([^)]+\))?\s*:\s*(.+)', line)
+                match = _GOOGLE_PARAM_RE.match(line)
                 if match:
                     param_name, param_desc = match.groups()
                     param_descriptions[param_name] = param_desc.strip()
             elif not in_args_section and line:
                 description_lines.append(line)
         
-        description = ' '.join(description_lines).strip()
+        description = ' '.join(description_lines)
         return description, param_descriptions
     
     def _parse_numpy_docstring(self, lines: List[str]) -> tuple[str, Dict[str, str]]:
-        """Parse NumPy-style docstring"""
+        """Parse NumPy-style docstring from pre-stripped lines"""
         description_lines = []
         param_descriptions = {}
         in_params_section = False
         current_param = None
         
         for line in lines:
-            line = line.strip()
-            
             if line == "Parameters":
                 in_params_section = True
                 continue
@@ -217,72 +342,62 @@ class SchemaGenerator:
                 # Parse parameter: "param_name : type" followed by description
                 if " : " in line:
                     current_param = line.split(" : ")[0].strip()
-                    param_descriptions[current_param] = ""
+                    param_descriptions[current_param] = []
                 elif current_param and line:
-                    param_descriptions[current_param] += " " + line
+                    param_descriptions[current_param].append(line)
             elif not in_params_section and line:
                 description_lines.append(line)
         
-        # Clean up parameter descriptions
+        # Join the collected description lines for each parameter
         for param in param_descriptions:
-            param_descriptions[param] = param_descriptions[param].strip()
+            param_descriptions[param] = " ".join(param_descriptions[param]).strip()
         
-        description = ' '.join(description_lines).strip()
+        description = ' '.join(description_lines)
         return description, param_descriptions
     
     def _parse_sphinx_docstring(self, lines: List[str]) -> tuple[str, Dict[str, str]]:
-        """Parse Sphinx-style docstring"""
+        """Parse Sphinx-style docstring from pre-stripped lines"""
         description_lines = []
         param_descriptions = {}
         
         for line in lines:
-            line = line.strip()
-            
             # Parse :param name: description
-            param_match = re.match(r':param\s+(\w+)\s*:\s*(.+)', line)
+            param_match = _SPHINX_PARAM_RE.match(line)
             if param_match:
                 param_name, param_desc = param_match.groups()
                 param_descriptions[param_name] = param_desc.strip()
             elif not line.startswith(":"):
                 description_lines.append(line)
         
+        # Blank lines are kept above, so trim the joined text
         description = ' '.join(description_lines).strip()
         return description, param_descriptions
     
     def _extract_first_paragraph(self, lines: List[str]) -> str:
-        """Extract first paragraph as description"""
+        """Extract first paragraph of pre-stripped lines as description"""
         description_lines = []
         for line in lines:
-            line = line.strip()
             if not line and description_lines:
                 break
             if line:
                 description_lines.append(line)
         return ' '.join(description_lines)
     
-    def _generate_input_schema(self, func_node: ast.FunctionDef, param_descriptions: Dict[str, str]) -> Dict[str, Any]:
+    def _generate_input_schema(self, func_node: Union[ast.FunctionDef, ast.AsyncFunctionDef], param_descriptions: Dict[str, str]) -> Dict[str, Any]:
         """Generate input schema from function AST node"""
+        args = func_node.args.args
+        
+        # Parameters without defaults are required; defaults belong to the last args
+        num_defaults = len(func_node.args.defaults)
+        threshold = len(args) - num_defaults
+        
         properties = {}
         required = []
-        
-        for arg in func_node.args.args:
+        for i, arg in enumerate(args):
             if arg.arg == 'self':  # Skip self parameter
                 continue
-                
-            param_name = arg.arg
-            param_schema = self._get_param_schema(arg, param_descriptions)
-            properties[param_name] = param_schema
-        
-        # Determine required parameters (those without defaults)
-        num_defaults = len(func_node.args.defaults) if func_node.args.defaults else 0
-        num_args = len(func_node.args.args)
-        
-        # Parameters without defaults are required
-        for i, arg in enumerate(func_node.args.args):
-            if arg.arg == 'self':
-                continue
-            # If this parameter doesn't have a default value, it's required
-            if i < num_args - num_defaults:
+            properties[arg.arg] = self._get_param_schema(arg, param_descriptions)
+            if i < threshold:
                 required.append(arg.arg)
         
         input_schema = {
@@ -297,27 +412,16 @@ class SchemaGenerator:
     
     def _get_param_schema(self, arg: ast.arg, param_descriptions: Dict[str, str]) -> Dict[str, Any]:
         """Generate schema for a single parameter"""
-        param_name = arg.arg
         param_type = self._extract_type_from_annotation(arg.annotation)
-        
-        schema = {
-            "type": param_type,
-            "description": param_descriptions.get(param_name, f"Parameter {param_name}")
-        }
-        
-        # Add additional properties based on type
-        if param_type == "array":
-            schema["items"] = {"type": "string"}  # Default item type
-        elif param_type == "object":
-            schema["additionalProperties"] = True
-            
-        return schema
+        return self._build_param_schema(arg.arg, param_type, param_descriptions)
     
     def _get_param_schema_from_signature(self, param: inspect.Parameter, param_descriptions: Dict[str, str]) -> Dict[str, Any]:
         """Generate schema from inspect.Parameter object"""
-        param_name = param.name
         param_type = self._python_type_to_json_schema(param.annotation)
-        
+        return self._build_param_schema(param.name, param_type, param_descriptions)
+    
+    def _build_param_schema(self, param_name: str, param_type: str, param_descriptions: Dict[str, str]) -> Dict[str, Any]:
+        """Build a parameter's schema from its JSON Schema type (shared by the AST and introspection paths)"""
         schema = {
             "type": param_type,
             "description": param_descriptions.get(param_name, f"Parameter {param_name}")
@@ -368,23 +472,24 @@ class SchemaGenerator:
         # Handle typing module types
         origin = get_origin(python_type)
         if origin is not None:
-            if origin is Union:
-                # Handle Optional and Union types
-                args = get_args(python_type)
-                if len(args) == 2 and type(None) in args:
-                    # This is Optional[T]
-                    non_none_type = args[0] if args[1] is type(None) else args[1]
-                    return self._python_type_to_json_schema(non_none_type)
-                else:
-                    # Regular Union, default to string
-                    return "string"
-            elif origin is list or origin is List:
-                return "array"
-            elif origin is dict or origin is Dict:
-                return "object"
+            json_type = self._classify_origin(origin, get_args(python_type))
+            if json_type is not None:
+                return json_type
         
         # Handle basic types
         return self.TYPE_MAPPING.get(python_type, "string")
+    
+    def _classify_origin(self, origin, args: tuple) -> Optional[str]:
+        """Map a generic type's origin and arguments to a JSON Schema type (None if unknown)"""
+        if origin is Union:
+            # Handle Optional and Union types
+            if len(args) == 2 and type(None) in args:
+                # This is Optional[T]
+                non_none_type = args[0] if args[1] is type(None) else args[1]
+                return self._python_type_to_json_schema(non_none_type)
+            # Regular Union, default to string
+            return "string"
+        return _ORIGIN_TYPES.get(origin)
 
 
 def generate_tool_schema(function_def: str) -> Dict[str, Any]:
@@ -415,6 +520,38 @@ def generate_schema_from_function(func) -> Dict[str, Any]:
     return generator.generate_from_function(func)
 
 
+def generate_tool_schemas(funcs: Iterable[Callable]) -> List[Dict[str, Any]]:
+    """
+    Generate schemas for several functions with one shared generator
+    
+    Args:
+        funcs (iterable): Python function objects
+        
+    Returns:
+        list: Claude tool schemas, in the same order as funcs
+    """
+    generator = SchemaGenerator()
+    return [generator.generate_from_function(func) for func in funcs]
+
+
+def compile_schema(func) -> Callable[[], Dict[str, Any]]:
+    """
+    Generate a function's schema once and return a builder for copies of it
+    
+    Useful when tools are registered at startup and their schemas are sent
+    with every request: all parsing happens here, and each call of the
+    returned builder only copies the finished schema.
+    
+    Args:
+        func: Python function object
+        
+    Returns:
+        callable: Zero-argument function returning a fresh copy of the schema
+    """
+    schema = generate_schema_from_function(func)
+    return lambda: copy.deepcopy(schema)
+
+
 def validate_schema(schema: Dict[str, Any]) -> bool:
     """
     Validate that the generated schema follows Claude tool format
@@ -425,10 +562,8 @@ def validate_schema(schema: Dict[str, Any]) -> bool:
     Returns:
         bool: True if valid, False otherwise
     """
-    required_keys = ["name", "description", "input_schema"]
-    
     # Check top-level structure
-    if not all(key in schema for key in required_keys):
+    if "name" not in schema or "description" not in schema or "input_schema" not in schema:
         return False
     
     # Check input_schema structure
@@ -447,7 +582,7 @@ def validate_schema(schema: Dict[str, Any]) -> bool:
     if not isinstance(properties, dict):
         return False
         
-    for prop_name, prop_schema in properties.items():
+    for prop_schema in properties.values():
         if not isinstance(prop_schema, dict):
             return False
         if "type" not in prop_schema or "description" not in prop_schema:
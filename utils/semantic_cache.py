@@ -0,0 +1,137 @@
+"""
+Semantic response cache for standalone prompts
+
+Paraphrased prompts ("What is the capital of France?" vs "Tell me France's
+capital") are matched by cosine similarity of their embeddings, so the second
+one can reuse the first one's answer instead of calling Claude again.
+"""
+import collections
+
+import numpy as np
+
+DEFAULT_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_MAX_ENTRIES = 512
+
+
+def _default_embedder(model_name=DEFAULT_MODEL_NAME):
+    """Build an embedding function backed by a local sentence-transformers model"""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        raise ImportError(
+            "The semantic cache needs sentence-transformers: "
+            "pip install sentence-transformers"
+        ) from e
+    model = SentenceTransformer(model_name)
+    return lambda text: model.encode(text)
+
+
+class SemanticCache:
+    """Stores (embedding, response) pairs and looks them up by cosine similarity"""
+
+    def __init__(self, embed_fn=None, threshold=DEFAULT_THRESHOLD, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            embed_fn (callable): Maps a string to a 1-D vector. Defaults to
+                a local all-MiniLM-L6-v2 model, loaded on first use.
+            threshold (float): Minimum cosine similarity counted as a hit
+            max_entries (int): Entries kept across all contexts; the oldest
+                entry of the least recently stored-to context goes first
+        """
+        self._embed_fn = embed_fn
+        self.threshold = threshold
+        self.max_entries = max_entries
+        # context key -> [embedding matrix, responses, number of rows in use],
+        # ordered from least to most recently stored to
+        self._buckets = collections.OrderedDict()
+        self._size = 0
+
+    def embed(self, text):
+        """
+        Embed text and normalize it to unit length
+
+        Pass the result to lookup() and store() as vector= so a prompt that
+        misses is only embedded once.
+        """
+        if self._embed_fn is None:
+            self._embed_fn = _default_embedder()
+        vec = np.asarray(self._embed_fn(text), dtype=np.float32).ravel()
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def lookup(self, prompt, context=None, vector=None):
+        """
+        Return a cached response for a semantically similar prompt
+
+        Only entries stored under the same context are considered, so a
+        prompt is never answered with a response produced for a different
+        model, system prompt, or conversation.
+
+        Args:
+            prompt (str): The prompt to look up
+            context (hashable): Key for the model/system settings of the request
+            vector (np.ndarray): The prompt's embedding from embed(), if known
+
+        Returns:
+            str: The cached response, or None on a miss
+        """
+        bucket = self._buckets.get(context)
+        if bucket is None or bucket[2] == 0:
+            return None
+        matrix, responses, size = bucket
+        if vector is None:
+            vector = self.embed(prompt)
+        scores = matrix[:size] @ vector
+        best = int(scores.argmax())
+        if scores[best] > self.threshold:
+            return responses[best]
+        return None
+
+    def store(self, prompt, response, context=None, vector=None):
+        """
+        Add a prompt/response pair to the cache
+
+        Args:
+            prompt (str): The prompt that produced the response
+            response (str): Claude's response
+            context (hashable): Key for the model/system settings of the request
+            vector (np.ndarray): The prompt's embedding from embed(), if known
+        """
+        vec = self.embed(prompt) if vector is None else vector
+        bucket = self._buckets.get(context)
+        if bucket is None:
+            bucket = [np.empty((1, vec.shape[0]), dtype=np.float32), [], 0]
+            self._buckets[context] = bucket
+        else:
+            self._buckets.move_to_end(context)
+        matrix, responses, size = bucket
+        if size == matrix.shape[0]:
+            # Grow by doubling so appends stay amortized O(1)
+            grown = np.empty((size * 2, matrix.shape[1]), dtype=np.float32)
+            grown[:size] = matrix
+            bucket[0] = matrix = grown
+        matrix[size] = vec
+        responses.append(response)
+        bucket[2] = size + 1
+        self._size += 1
+
+        while self._size > self.max_entries:
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        """Drop the oldest entry of the least recently stored-to context"""
+        context, bucket = next(iter(self._buckets.items()))
+        matrix, responses, size = bucket
+        if size == 1:
+            del self._buckets[context]
+        else:
+            matrix[:size - 1] = matrix[1:size]
+            del responses[0]
+            bucket[2] = size - 1
+        self._size -= 1
+
+    def clear(self):
+        """Drop every cached entry"""
+        self._buckets.clear()
+        self._size = 0